@@ -1,7 +1,70 @@
+import csv
 import io
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:  # pragma: no cover - 可选依赖
+    pa = None
+    pacsv = None
+
 REQUIRED_COLUMNS = ["hinban", "kidou", "zaiku"]
+# 解析表头时最多读取的字符数，超出时由 PyArrow 报错并交给 pandas 处理
+_HEADER_PREFIX_CHARS = 64 * 1024
+
+
+def _dedupe_header(names: list[str]) -> list[str]:
+    """与 pandas 的 C 解析器相同地为重复列名加上 .1、.2 等后缀"""
+    header = set(names)
+    counts: dict[str, int] = {}
+    deduped: list[str] = []
+    for base in names:
+        name = base
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[base] = count + 1
+            name = f"{base}.{count}"
+            # 跳过表头中已经存在的列名
+            count = count + 1 if name in header else counts.get(name, 0)
+        deduped.append(name)
+        counts[name] = count + 1
+    return deduped
+
+
+def _read_csv_text(text: str) -> pd.DataFrame:
+    """将已解码的CSV文本全部按字符串列读取，优先使用 PyArrow"""
+    header: list[str] = []
+    if pacsv is not None:
+        header = next(csv.reader(io.StringIO(text[:_HEADER_PREFIX_CHARS])), [])
+    if header:
+        # PyArrow 会保留重复列名，这里自行指定与 pandas 一致的列名
+        names = _dedupe_header(header)
+        # 只转换必要列，其余列不进入 pandas
+        include = [name for name in names if name.lower().strip() in REQUIRED_COLUMNS]
+        try:
+            table = pacsv.read_csv(
+                io.BytesIO(text.encode("utf-8")),
+                read_options=pacsv.ReadOptions(column_names=names, skip_rows=1),
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=include,
+                    column_types={name: pa.string() for name in include},
+                    null_values=[],
+                    strings_can_be_null=False,
+                    quoted_strings_can_be_null=False,
+                ),
+            )
+            return table.to_pandas()
+        except pa.ArrowInvalid:
+            # 列数不一致等 PyArrow 无法解析的文件交给 pandas 处理
+            pass
+    return pd.read_csv(
+        io.StringIO(text),
+        dtype=str,
+        keep_default_na=False,
+        na_filter=False,
+        low_memory=False,
+    )
 
 
 def load_db_csv(data: bytes) -> pd.DataFrame:
@@ -9,17 +72,11 @@ def load_db_csv(data: bytes) -> pd.DataFrame:
     df: pd.DataFrame | None = None
     for enc in ("utf-8-sig", "cp932", "shift_jis", "utf-8"):
         try:
-            df = pd.read_csv(
-                io.BytesIO(data),
-                encoding=enc,
-                dtype=str,
-                keep_default_na=False,
-                na_filter=False,
-                low_memory=False,
-            )
-            break
+            text = data.decode(enc)
         except UnicodeDecodeError:
             continue
+        df = _read_csv_text(text)
+        break
     if df is None:
         raise ValueError("CSVの文字コードを判別できません。UTF-8 で保存してください。")
 
@@ -7,10 +7,28 @@ from typing import List, Tuple
 import pdfplumber
 
 from .ocr_backend import OCRResult, ocr_pages
+from .utils import PDFIUM_LOCK
 
 logger = logging.getLogger(__name__)
 
 
+def extract_text_with_pdfium(pdf_path: Path) -> List[str]:
+    import pypdfium2 as pdfium
+
+    texts: List[str] = []
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(str(pdf_path))
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range() or "")
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+    return texts
+
+
 def extract_text_with_pdfplumber(pdf_path: Path) -> List[str]:
     texts: List[str] = []
     with pdfplumber.open(pdf_path) as pdf:
@@ -21,8 +39,15 @@ def extract_text_with_pdfplumber(pdf_path: Path) -> List[str]:
 
 
 def extract_pdf_text(pdf_path: Path, backend: str = "yomitoku") -> Tuple[List[str], str]:
-    pdf_texts = extract_text_with_pdfplumber(pdf_path)
+    try:
+        pdf_texts = extract_text_with_pdfium(pdf_path)
+    except Exception as exc:
+        logger.warning("pypdfium2 text extraction failed for %s: %s", pdf_path, exc)
+        pdf_texts = []
     joined = "".join(pdf_texts).strip()
+    if len(joined) < 20:
+        pdf_texts = extract_text_with_pdfplumber(pdf_path)
+        joined = "".join(pdf_texts).strip()
     if len(joined) >= 20:
         logger.info("Using text layer for %s", pdf_path)
         return pdf_texts, "text-layer"
@@ -1,26 +1,62 @@
 from __future__ import annotations
 
+import csv
 import logging
 import os
 import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Dict, List
 
-import pandas as pd
 from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 
 from .db import load_db_csv
 from .extract import extract_pdf_text
-from .match import build_database_index, extract_tokens, match_token_to_db
+from .match import (
+    DatabaseIndex,
+    build_database_index,
+    clear_normalize_cache,
+    extract_tokens,
+    match_token_to_db,
+)
+from .ocr_backend import warm_up
 from .models import RetryRequest, RetryResponse, StatusResponse, UploadResponse
-from .utils import TaskState, generate_task_id, init_task_storage
+from .utils import (
+    ShardedDict,
+    TaskState,
+    generate_task_id,
+    init_task_storage,
+    save_upload_file,
+    to_progress,
+)
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="AI見積OCRシステム API")
+OCR_WARM_UP = os.getenv("OCR_WARM_UP", "1").strip().lower() in {"1", "true", "yes"}
+
+
+def _warm_up_ocr(backend: str) -> None:
+    try:
+        warm_up(backend)
+        logger.info("OCR engine for %s is ready", backend)
+    except Exception as exc:
+        logger.warning("OCR エンジンの事前ロードに失敗しました (%s): %s", backend, exc)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if OCR_WARM_UP:
+        # Load models in the background so the API accepts requests immediately.
+        threading.Thread(target=_warm_up_ocr, args=(_get_default_backend(),), daemon=True).start()
+    yield
+
+
+app = FastAPI(title="AI見積OCRシステム API", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -29,14 +65,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-TASKS: Dict[str, TaskState] = {}
-TASK_LOCK = threading.Lock()
-DB_PATHS: Dict[str, Path] = {}
-RESULT_CACHE: Dict[str, List[Dict[str, str]]] = {}
-FAILURE_CACHE: Dict[str, List[Dict[str, str]]] = {}
+TASKS: ShardedDict[str, TaskState] = ShardedDict()
+DB_PATHS: ShardedDict[str, Path] = ShardedDict()
+RESULT_CACHE: ShardedDict[str, List[Dict[str, object]]] = ShardedDict()
+FAILURE_CACHE: ShardedDict[str, List[Dict[str, object]]] = ShardedDict()
+# Most recently used database indexes, so /api/retry does not re-parse the CSV.
+INDEX_CACHE: "OrderedDict[str, DatabaseIndex]" = OrderedDict()
+INDEX_CACHE_LOCK = threading.Lock()
 
 ALLOWED_OCR_BACKENDS = {"yomitoku", "rapidocr", "paddleocr"}
 
+# Larger result sets are served from the CSV on disk instead of being kept in memory.
+RESULT_CACHE_MAX_ROWS = int(os.getenv("RESULT_CACHE_MAX_ROWS", "5000"))
+# Rows never change once a task has completed.
+RESULT_HEADERS = {"Cache-Control": "private, max-age=3600"}
+INDEX_CACHE_SIZE = int(os.getenv("INDEX_CACHE_SIZE", "8"))
+
+RESULT_COLUMNS = ["pdf_name", "page", "token", "hinban", "kidou", "zaiku"]
+FAILURE_COLUMNS = ["pdf_name", "page", "token"]
+
 
 def _get_default_backend() -> str:
     default_backend = os.getenv("OCR_BACKEND_DEFAULT", "yomitoku").strip().lower()
@@ -46,18 +93,54 @@ def _get_default_backend() -> str:
     return default_backend
 
 
+def _cache_index(task_id: str, index: DatabaseIndex) -> None:
+    with INDEX_CACHE_LOCK:
+        INDEX_CACHE[task_id] = index
+        INDEX_CACHE.move_to_end(task_id)
+        while len(INDEX_CACHE) > max(0, INDEX_CACHE_SIZE):
+            INDEX_CACHE.popitem(last=False)
+
+
+def _get_index(task_id: str, db_path: Path) -> DatabaseIndex:
+    with INDEX_CACHE_LOCK:
+        index = INDEX_CACHE.get(task_id)
+        if index is not None:
+            INDEX_CACHE.move_to_end(task_id)
+            return index
+    index = build_database_index(load_db_csv(db_path.read_bytes()))
+    _cache_index(task_id, index)
+    return index
+
+
+def _write_rows_csv(path: Path, rows: List[Dict[str, object]], columns: List[str]) -> None:
+    with open(path, "w", encoding="utf-8-sig", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=columns, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _read_rows_csv(path: Path | None) -> List[Dict[str, object]]:
+    if path is None or not path.exists():
+        return []
+    with open(path, encoding="utf-8-sig", newline="") as handle:
+        rows: List[Dict[str, object]] = list(csv.DictReader(handle))
+    for row in rows:
+        row["page"] = int(str(row["page"]))
+    return rows
+
+
 def _process_task(
     task_id: str,
     db_bytes: bytes,
-    pdf_entries: List[tuple[str, bytes]],
+    pdf_entries: List[tuple[str, Path]],
     ocr_backend: str,
 ) -> None:
-    with TASK_LOCK:
-        state = TASKS.get(task_id)
+    state = TASKS.get(task_id)
     if state is None:
         return
 
     state.backend_requested = ocr_backend
+    clear_normalize_cache()
 
     task_dir = init_task_storage(task_id)
     try:
@@ -65,7 +148,10 @@ def _process_task(
         index = build_database_index(df)
         db_path = task_dir / "database.csv"
         df.to_csv(db_path, index=False, encoding="utf-8-sig")
+        # Only the index is needed from here on; release the raw frame before OCR.
+        del df
         DB_PATHS[task_id] = db_path
+        _cache_index(task_id, index)
     except ValueError as exc:
         state.status = "error"
         state.error = str(exc)
@@ -78,9 +164,7 @@ def _process_task(
         return
 
     pdf_texts: List[tuple[str, List[str]]] = []
-    for name, data in pdf_entries:
-        pdf_path = task_dir / name
-        pdf_path.write_bytes(data)
+    for name, pdf_path in pdf_entries:
         try:
             texts, backend_used = extract_pdf_text(pdf_path, backend=ocr_backend)
             state.backend_used = backend_used
@@ -96,55 +180,66 @@ def _process_task(
         pdf_texts.append((name, texts))
         state.pages += len(texts)
 
-    results: List[Dict[str, str]] = []
-    failures: List[Dict[str, str]] = []
+    results: List[Dict[str, object]] = []
+    failures: List[Dict[str, object]] = []
     state.status = "processing"
     processed_pages = 0
 
-    for pdf_name, pages in pdf_texts:
-        for page_idx, page_text in enumerate(pages, start=1):
-            tokens = extract_tokens(page_text)
-            state.totals["tokens"] += len(tokens)
-            for token in tokens:
-                match = match_token_to_db(token, index)
-                if match.get("matched"):
-                    results.append(
-                        {
-                            "pdf_name": pdf_name,
-                            "page": page_idx,
-                            "token": token,
-                            "hinban": match.get("hinban", ""),
-                            "kidou": match.get("kidou", ""),
-                            "zaiku": match.get("zaiku", ""),
-                        }
-                    )
-                    state.totals["matched"] += 1
-                else:
-                    failures.append(
-                        {
-                            "pdf_name": pdf_name,
-                            "page": page_idx,
-                            "token": token,
-                        }
-                    )
-                    state.totals["fail"] += 1
-            processed_pages += 1
-            state.progress = int(min(100, (processed_pages / max(1, state.pages)) * 100))
-
-    results_columns = ["pdf_name", "page", "token", "hinban", "kidou", "zaiku"]
-    results_df = pd.DataFrame(results, columns=results_columns)
-    if not results_df.empty:
-        results_df = results_df.sort_values(by=["pdf_name", "page"])
+    # Tokenising costs ~0.5 ms a page, far less than spawning a worker process,
+    # so pages are tokenised inline.
+    page_tokens: List[tuple[str, int, List[str]]] = [
+        (pdf_name, page_idx, extract_tokens(page_text))
+        for pdf_name, pages in pdf_texts
+        for page_idx, page_text in enumerate(pages, start=1)
+    ]
+
+    # The same part number tends to recur on many pages; match each distinct token once.
+    unique_tokens: set[str] = set().union(*(tokens for _, _, tokens in page_tokens))
+    match_cache = {token: match_token_to_db(token, index) for token in unique_tokens}
+
+    # Counters are only touched by this thread and published as a fresh dict per
+    # page, so status readers always see a consistent snapshot without locking.
+    totals = dict(state.totals)
+    for pdf_name, page_idx, tokens in page_tokens:
+        totals["tokens"] += len(tokens)
+        for token in tokens:
+            match = match_cache[token]
+            if match.get("matched"):
+                results.append(
+                    {
+                        "pdf_name": pdf_name,
+                        "page": page_idx,
+                        "token": token,
+                        "hinban": match.get("hinban", ""),
+                        "kidou": match.get("kidou", ""),
+                        "zaiku": match.get("zaiku", ""),
+                    }
+                )
+                totals["matched"] += 1
+            else:
+                failures.append(
+                    {
+                        "pdf_name": pdf_name,
+                        "page": page_idx,
+                        "token": token,
+                    }
+                )
+                totals["fail"] += 1
+        processed_pages += 1
+        state.totals = dict(totals)
+        state.progress = to_progress(state.pages, processed_pages)
+
+    results.sort(key=lambda row: (row["pdf_name"], row["page"]))
     results_path = task_dir / "results.csv"
-    results_df.to_csv(results_path, index=False, encoding="utf-8-sig")
-    RESULT_CACHE[task_id] = results_df.to_dict(orient="records") if not results_df.empty else []
+    _write_rows_csv(results_path, results, RESULT_COLUMNS)
+    if len(results) <= RESULT_CACHE_MAX_ROWS:
+        RESULT_CACHE[task_id] = results
 
-    failures_df = pd.DataFrame(failures, columns=["pdf_name", "page", "token"])
-    if not failures_df.empty:
-        failures_df = failures_df.sort_values(by=["pdf_name", "page"])
+    failures.sort(key=lambda row: (row["pdf_name"], row["page"]))
     failures_path = task_dir / "failure.csv"
-    failures_df.to_csv(failures_path, index=False, encoding="utf-8-sig")
-    FAILURE_CACHE[task_id] = failures_df.to_dict(orient="records") if not failures_df.empty else []
+    _write_rows_csv(failures_path, failures, FAILURE_COLUMNS)
+    if len(failures) <= RESULT_CACHE_MAX_ROWS:
+        FAILURE_CACHE[task_id] = failures
 
     state.results_path = results_path
     state.failures_path = failures_path
@@ -167,13 +262,18 @@ async def upload(
 
     task_id = generate_task_id()
     state = TaskState()
-    with TASK_LOCK:
-        TASKS[task_id] = state
+    TASKS[task_id] = state
 
     db_bytes = await db_csv.read()
-    pdf_entries: List[tuple[str, bytes]] = []
+    # PDFs can be large, so stream them straight into task storage instead of
+    # reading each one into memory.
+    task_dir = init_task_storage(task_id)
+    pdf_entries: List[tuple[str, Path]] = []
     for pdf in pdfs:
-        pdf_entries.append((pdf.filename or "document.pdf", await pdf.read()))
+        name = pdf.filename or "document.pdf"
+        pdf_path = task_dir / name
+        await run_in_threadpool(save_upload_file, pdf_path, pdf.file)
+        pdf_entries.append((name, pdf_path))
 
     thread = threading.Thread(
         target=_process_task,
@@ -195,7 +295,7 @@ async def status(task_id: str):
     return StatusResponse(
         progress=state.progress,
         pages=state.pages,
-        totals=state.totals,
+        totals=dict(state.totals),
         backend_used=state.backend_used,
     )
 
@@ -207,7 +307,11 @@ async def get_results(task_id: str):
         raise HTTPException(status_code=404, detail="タスクが見つかりません。")
     if state.status != "completed":
         raise HTTPException(status_code=400, detail="処理が完了していません。")
-    return RESULT_CACHE.get(task_id, [])
+    rows = RESULT_CACHE.get(task_id)
+    if rows is None:
+        # Large result sets are parsed off the event loop.
+        rows = await run_in_threadpool(_read_rows_csv, state.results_path)
+    return JSONResponse(rows, headers=RESULT_HEADERS)
 
 
 @app.get("/api/failures/{task_id}")
@@ -217,7 +321,11 @@ async def get_failures(task_id: str):
         raise HTTPException(status_code=404, detail="タスクが見つかりません。")
     if state.status != "completed":
         raise HTTPException(status_code=400, detail="処理が完了していません。")
-    return FAILURE_CACHE.get(task_id, [])
+    rows = FAILURE_CACHE.get(task_id)
+    if rows is None:
+        # Large result sets are parsed off the event loop.
+        rows = await run_in_threadpool(_read_rows_csv, state.failures_path)
+    return JSONResponse(rows, headers=RESULT_HEADERS)
 
 
 @app.post("/api/retry", response_model=RetryResponse)
@@ -229,8 +337,7 @@ async def retry(request: RetryRequest):
     if db_path is None or not db_path.exists():
         raise HTTPException(status_code=400, detail="DBが利用できません。再度アップロードしてください。")
 
-    df = load_db_csv(db_path.read_bytes())
-    index = build_database_index(df)
+    index = _get_index(request.task_id, db_path)
     match = match_token_to_db(request.token, index)
     candidates: List[str] = []
     if match.get("matched"):
@@ -3,13 +3,23 @@ from __future__ import annotations
 import re
 import unicodedata
 from dataclasses import dataclass
-from typing import Dict, List, Set, TYPE_CHECKING
+from functools import lru_cache
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, TYPE_CHECKING
+
+try:
+    import marisa_trie
+except ImportError:  # pragma: no cover - optional dependency
+    marisa_trie = None
 
 if TYPE_CHECKING:  # pragma: no cover
     import pandas as pd
 
 TOKEN_PATTERN = re.compile(r"[A-Z0-9][A-Z0-9\-_\/]{3,}")
-BLACKLIST = {
+# Part numbers always carry a digit. Checking each match is linear, whereas a
+# lookahead in TOKEN_PATTERN is re-run at every start of a digit-free run.
+_HAS_DIGIT = re.compile(r"[0-9]").search
+_WS = re.compile(r"[\s\u3000]+")
+BLACKLIST = frozenset({
     "SCALE",
     "DATE",
     "PAGE",
@@ -23,50 +33,111 @@ BLACKLIST = {
     "CODE",
     "FAX",
     "TEL",
-}
+})
+ROW_FIELDS = ("hinban", "kidou", "zaiku")
+
+
+class TrieRowMap(Mapping[str, Dict[str, str]]):
+    """Read-only mapping whose keys live in a marisa-trie.
+
+    The trie stores the (often prefix-sharing) part numbers far more compactly
+    than dict keys, and rows are kept as tuples indexed by the trie's key id.
+    """
+
+    def __init__(self, rows: Dict[str, Dict[str, str]]) -> None:
+        self._trie = marisa_trie.Trie(rows.keys())
+        self._rows: List[Tuple[str, ...]] = [()] * len(self._trie)
+        for key, row in rows.items():
+            self._rows[self._trie[key]] = tuple(row[field] for field in ROW_FIELDS)
+
+    def get(self, key: str, default: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:  # type: ignore[override]
+        key_id = self._trie.get(key)
+        if key_id is None:
+            return default
+        return dict(zip(ROW_FIELDS, self._rows[key_id]))
+
+    def __getitem__(self, key: str) -> Dict[str, str]:
+        return dict(zip(ROW_FIELDS, self._rows[self._trie[key]]))
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._trie
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._trie.iterkeys())
+
+    def __len__(self) -> int:
+        return len(self._trie)
 
 
 @dataclass
 class DatabaseIndex:
-    df: "pd.DataFrame"
-    hinban_set: Set[str]
+    hinban_rows: Mapping[str, Dict[str, str]]
 
 
 def normalize(value: str) -> str:
     if value is None:
         return ""
-    text = unicodedata.normalize("NFKC", str(value))
+    return _normalize_cached(str(value))
+
+
+def _normalize_text(value: str) -> str:
+    text = unicodedata.normalize("NFKC", value)
     text = text.upper()
+    # Chained str.replace beats a character-class regex here, even on full pages.
     text = text.replace("–", "-").replace("—", "-").replace("−", "-")
-    text = re.sub(r"[\s\u3000]+", " ", text)
+    text = _WS.sub(" ", text)
     return text.strip()
 
 
+# Only short, frequently repeated values such as tokens are worth memoising;
+# page bodies go through the uncached version.
+_normalize_cached = lru_cache(maxsize=8192)(_normalize_text)
+
+
+def clear_normalize_cache() -> None:
+    """Drop memoised :func:`normalize` results, e.g. at the start of a task."""
+    _normalize_cached.cache_clear()
+
+
+def normalize_series(series: "pd.Series") -> "pd.Series":
+    """Column-wise equivalent of :func:`normalize`.
+
+    Object-dtype ``.str`` methods each loop in Python, so one ``map`` over the
+    scalar implementation is cheaper than chaining them.
+    """
+    return series.fillna("").astype(str).map(_normalize_text)
+
+
 def extract_tokens(text: str) -> List[str]:
     if not text:
         return []
-    cleaned = normalize(text)
-    candidates = set()
-    for match in TOKEN_PATTERN.findall(cleaned):
-        if any(ch.isdigit() for ch in match) and match not in BLACKLIST:
-            candidates.add(match)
-    return sorted(candidates)
+    # Page texts practically never repeat, so keep them out of the token cache.
+    cleaned = _normalize_text(text)
+    return sorted(
+        {match for match in TOKEN_PATTERN.findall(cleaned) if match not in BLACKLIST and _HAS_DIGIT(match)}
+    )
 
 
 def build_database_index(df: "pd.DataFrame") -> DatabaseIndex:
-    frame = df.copy()
-    frame["hinban"] = frame["hinban"].fillna("")
-    frame["kidou"] = frame["kidou"].fillna("")
-    frame["zaiku"] = frame["zaiku"].fillna("")
-    frame["HINBAN_N"] = frame["hinban"].apply(normalize)
-    hinban_set: Set[str] = set(frame["HINBAN_N"])
-    return DatabaseIndex(df=frame, hinban_set=hinban_set)
+    # Read the source columns directly; the caller's frame is neither copied nor mutated.
+    hinban_rows: Dict[str, Dict[str, str]] = {}
+    for hinban_n, hinban, kidou, zaiku in zip(
+        normalize_series(df["hinban"]),
+        df["hinban"].fillna(""),
+        df["kidou"].fillna(""),
+        df["zaiku"].fillna(""),
+    ):
+        # The first row wins for duplicated hinban values.
+        hinban_rows.setdefault(hinban_n, {"hinban": hinban, "kidou": kidou, "zaiku": zaiku})
+    if marisa_trie is not None:
+        return DatabaseIndex(hinban_rows=TrieRowMap(hinban_rows))
+    return DatabaseIndex(hinban_rows=hinban_rows)
 
 
 def match_token_to_db(token: str, index: DatabaseIndex) -> Dict[str, object]:
     token_n = normalize(token)
-    if token_n in index.hinban_set:
-        row = index.df.loc[index.df["HINBAN_N"] == token_n].iloc[0]
+    row = index.hinban_rows.get(token_n)
+    if row is not None:
         return {
             "matched": True,
             "hinban": row["hinban"],
@@ -1,31 +1,83 @@
 """OCR backend integration layer supporting YomiToku and legacy engines."""
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
+import queue
+import re
+import shutil
 import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from importlib import import_module
 from pathlib import Path
-from typing import Iterable, List, Callable, Any
+from typing import Iterable, Iterator, List, Callable, Any
 
 import cv2
 import httpx
 import numpy as np
 from pdf2image import convert_from_path
 
-from .utils import execute_concurrently, retry_with_backoff
+from .utils import PDFIUM_LOCK, STORAGE_ROOT, execute_concurrently, retry_with_backoff
 
 logger = logging.getLogger(__name__)
 
-_RAPID_OCR = None
 _PADDLE_OCR = None
+# Guards lazy engine construction so concurrent page workers load each model once.
+_ENGINE_LOCK = threading.Lock()
+# PaddleOCR predictors are not safe to call from several threads at once.
+_PADDLE_LOCK = threading.Lock()
 
 YOMITOKU_TIMEOUT = int(os.getenv("YOMITOKU_TIMEOUT", "60"))
 YOMITOKU_MAX_WORKERS = int(os.getenv("YOMITOKU_MAX_WORKERS", "4"))
 YOMITOKU_MAX_RETRIES = int(os.getenv("YOMITOKU_MAX_RETRIES", "3"))
 YOMITOKU_RETRY_BASE_DELAY = float(os.getenv("YOMITOKU_RETRY_BASE_DELAY", "1.0"))
 YOMITOKU_RETRY_MULTIPLIER = float(os.getenv("YOMITOKU_RETRY_MULTIPLIER", "2.0"))
+OCR_DPI = int(os.getenv("OCR_DPI", "250"))
+_CPU_COUNT = os.cpu_count() or 1
+# Local engines are CPU-bound, so they scale with cores rather than with the
+# YomiToku request concurrency.
+OCR_MAX_WORKERS = max(1, int(os.getenv("OCR_MAX_WORKERS", str(_CPU_COUNT))))
+OCR_PNG_COMPRESSION = int(os.getenv("OCR_PNG_COMPRESSION", "6"))
+# Opt back into the median + bilateral + adaptive-threshold chain for noisy scans.
+OCR_HEAVY_DENOISE = os.getenv("OCR_HEAVY_DENOISE", "0").strip().lower() in {"1", "true", "yes"}
+# Text lines recognised per inference call by the local engines.
+OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", "8"))
+# Fixed ONNX Runtime thread count per session; by default it follows how many
+# pages run side by side (see _RAPID_POOL and _RAPID_SOLO_POOL).
+RAPIDOCR_INTRA_OP_THREADS = int(os.getenv("RAPIDOCR_INTRA_OP_THREADS", "0"))
+RAPIDOCR_USE_CUDA = os.getenv("RAPIDOCR_USE_CUDA", "0").strip().lower() in {"1", "true", "yes"}
+# INT8 models produced by scripts/quantize_rapidocr.py.
+RAPIDOCR_INT8 = os.getenv("RAPIDOCR_INT8", "0").strip().lower() in {"1", "true", "yes"}
+RAPIDOCR_INT8_DIR = Path(os.getenv("RAPIDOCR_INT8_DIR", str(Path.home() / ".rapidocr" / "int8"))).expanduser()
+# Opt-in cache of rendered pages per (PDF hash, DPI). It only pays off when the
+# same PDF is uploaded again, and entries outlive the task that created them,
+# so it is disabled (size 0) by default.
+OCR_RASTER_CACHE_DIR = Path(os.getenv("OCR_RASTER_CACHE_DIR", str(STORAGE_ROOT / "_rasters"))).expanduser()
+OCR_RASTER_CACHE_SIZE = int(os.getenv("OCR_RASTER_CACHE_SIZE", "0"))
+
+# OpenCV keeps its own thread pool unless some job is running pages in parallel.
+_OPENCV_DEFAULT_THREADS = cv2.getNumThreads()
+_PARALLEL_JOBS = 0
+_PARALLEL_JOBS_LOCK = threading.Lock()
+# Set while the current thread processes a job's only page worker.
+_SOLO = threading.local()
+
+# Local page files are read straight back by the workers; the stronger
+# OCR_PNG_COMPRESSION level is only worth it for the YomiToku upload.
+_PAGE_PNG_COMPRESSION = 1
+_RASTER_STAGING_PREFIX = ".staging-"
+# Cache entries currently in use, with the number of tasks using each.
+_RASTER_CACHE_USERS: dict[Path, int] = {}
+_RASTER_CACHE_LOCK = threading.Lock()
+_PAGE_NUMBER = re.compile(r"(\d+)\.png$")
+
+_DESKEW_SCALE = 0.25
+_MIN_DESKEW_ANGLE = 0.1
 
 
 class OCRResult(list):
@@ -40,72 +92,200 @@ class YomiTokuError(RuntimeError):
     """Custom error raised when YomiToku integration fails."""
 
 
-def _preprocess(image: np.ndarray) -> np.ndarray:
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    gray = cv2.medianBlur(gray, 3)
-    gray = cv2.bilateralFilter(gray, 9, 75, 75)
-    thresh = cv2.adaptiveThreshold(
-        gray,
-        255,
-        cv2.ADAPTIVE_THRESH_MEAN_C,
-        cv2.THRESH_BINARY,
-        31,
-        10,
-    )
-    coords = np.column_stack(np.where(thresh < 255))
-    if coords.size > 0:
+def _preprocess(image: np.ndarray, heavy_denoise: bool | None = None) -> np.ndarray:
+    if heavy_denoise is None:
+        heavy_denoise = OCR_HEAVY_DENOISE
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if heavy_denoise:
+        gray = cv2.medianBlur(gray, 3)
+        gray = cv2.bilateralFilter(gray, 9, 75, 75)
+        # Same result as adaptiveThreshold(MEAN_C, block 31, C=10):
+        # gray > mean - 10  <=>  gray + 9 >= mean for integers, and the
+        # saturating add keeps it exact at the top of the range. Skipping the
+        # lookup-table pass makes it noticeably cheaper on full pages.
+        mean = cv2.boxFilter(gray, -1, (31, 31), borderType=cv2.BORDER_REPLICATE | cv2.BORDER_ISOLATED)
+        thresh = cv2.compare(cv2.add(gray, 9), mean, cv2.CMP_GE)
+        del mean
+    else:
+        # A small blur plus a global Otsu threshold is enough for the OCR models,
+        # which normalise their input themselves, and avoids the
+        # O(pixels * d^2) bilateral filter.
+        gray = cv2.GaussianBlur(gray, (3, 3), 0)
+        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    # The filtered copy is no longer needed; free it before the warp allocates another page.
+    del gray
+    # Skew is scale-invariant, so estimate it on a downscaled copy; that cuts the
+    # foreground coordinates handed to minAreaRect by ~16x.
+    small = cv2.resize(thresh, None, fx=_DESKEW_SCALE, fy=_DESKEW_SCALE, interpolation=cv2.INTER_AREA)
+    points = cv2.findNonZero(cv2.bitwise_not(small))
+    if points is not None:
+        # findNonZero yields (x, y); keep the (row, col) order the angle handling below expects.
+        coords = np.ascontiguousarray(points.reshape(-1, 2)[:, ::-1])
         angle = cv2.minAreaRect(coords)[-1]
+        # OpenCV < 4.5 reports [-90, 0) and newer releases (0, 90]; fold both into
+        # [-45, 45) so an upright page is not turned by 90 degrees.
         if angle < -45:
-            angle = -(90 + angle)
-        else:
-            angle = -angle
+            angle += 90
+        elif angle >= 45:
+            angle -= 90
+        angle = -angle
+        # Clean scans come out near 0 degrees; warping them would only blur the page.
+        if abs(angle) < _MIN_DESKEW_ANGLE:
+            return thresh
         (height, width) = thresh.shape[:2]
         center = (width // 2, height // 2)
         matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
+        # Bicubic buys nothing on a binary image; linear is several times cheaper.
         thresh = cv2.warpAffine(
             thresh,
             matrix,
             (width, height),
-            flags=cv2.INTER_CUBIC,
+            flags=cv2.INTER_LINEAR,
             borderMode=cv2.BORDER_REPLICATE,
         )
     return thresh
 
 
 def _encode_png(image: np.ndarray) -> bytes:
-    success, buffer = cv2.imencode(".png", image)
+    # OCR does not need colour; a single channel cuts the payload roughly threefold.
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    success, buffer = cv2.imencode(".png", image, [cv2.IMWRITE_PNG_COMPRESSION, OCR_PNG_COMPRESSION])
     if not success:
         raise YomiTokuError("Failed to encode page image to PNG for YomiToku.")
     return buffer.tobytes()
 
 
-def _get_rapid_ocr():
-    global _RAPID_OCR
-    if _RAPID_OCR is None:
+def _load_page(page_path: str) -> np.ndarray:
+    # Pages are rendered in grayscale; every consumer works on a single channel.
+    image = cv2.imread(page_path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise RuntimeError(f"ページ画像を読み込めません: {page_path}")
+    return image
+
+
+def _rapid_ocr_options(intra_op_threads: int) -> dict[str, Any]:
+    # RapidOCR already builds its ONNX Runtime sessions with ORT_ENABLE_ALL graph
+    # optimisation; what it leaves to the caller is threading and the provider.
+    return {
+        "rec_batch_num": OCR_BATCH_SIZE,
+        "cls_batch_num": OCR_BATCH_SIZE,
+        "intra_op_num_threads": max(1, intra_op_threads),
+        # Each model is a single sequential graph, so inter-op parallelism only adds threads.
+        "inter_op_num_threads": 1,
+        "det_use_cuda": RAPIDOCR_USE_CUDA,
+        "cls_use_cuda": RAPIDOCR_USE_CUDA,
+        "rec_use_cuda": RAPIDOCR_USE_CUDA,
+        **_rapid_int8_model_paths(),
+    }
+
+
+def _rapid_int8_model_paths() -> dict[str, str]:
+    if not RAPIDOCR_INT8:
+        return {}
+    paths: dict[str, str] = {}
+    for kind in ("det", "rec"):
+        model_path = RAPIDOCR_INT8_DIR / f"{kind}_int8.onnx"
+        if model_path.exists():
+            paths[f"{kind}_model_path"] = str(model_path)
+        else:
+            logger.warning("INT8 モデルが見つかりません。FP32 モデルを使用します: %s", model_path)
+    return paths
+
+
+def _create_rapid_ocr(intra_op_threads: int):
+    try:
+        from rapidocr_onnxruntime import RapidOCR  # type: ignore
+    except ImportError as exc:  # pragma: no cover
+        raise RuntimeError("rapidocr-onnxruntime がインストールされていません。") from exc
+    return RapidOCR(**_rapid_ocr_options(intra_op_threads))
+
+
+class _EnginePool:
+    """Bounded pool of RapidOCR engines sharing one intra-op thread count.
+
+    Engines are built lazily, so each page worker can hold its own instead of
+    sharing one engine's internal state.
+    """
+
+    def __init__(self, size: int, intra_op_threads: int) -> None:
+        self.size = size
+        self.intra_op_threads = intra_op_threads
+        self._idle: "queue.Queue[Any]" = queue.Queue()
+        self._created = 0
+
+    def try_acquire(self) -> Any | None:
+        """Return an idle engine, building one if the pool is not full yet."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with _ENGINE_LOCK:
+            if self._created >= self.size:
+                return None
+            self._created += 1
         try:
-            from rapidocr_onnxruntime import RapidOCR  # type: ignore
-        except ImportError as exc:  # pragma: no cover
-            raise RuntimeError("rapidocr-onnxruntime がインストールされていません。") from exc
-        _RAPID_OCR = RapidOCR()
-    return _RAPID_OCR
+            return _create_rapid_ocr(self.intra_op_threads)
+        except Exception:
+            with _ENGINE_LOCK:
+                self._created -= 1
+            raise
+
+    def acquire(self) -> Any:
+        engine = self.try_acquire()
+        return engine if engine is not None else self._idle.get()
+
+    def release(self, engine: Any) -> None:
+        self._idle.put(engine)
+
+
+# Engines for jobs that run pages in parallel split the cores between workers.
+_RAPID_POOL = _EnginePool(OCR_MAX_WORKERS, RAPIDOCR_INTRA_OP_THREADS or max(1, _CPU_COUNT // OCR_MAX_WORKERS))
+# A job with a single page worker gets an engine that may use every core.
+_RAPID_SOLO_POOL = _EnginePool(1, RAPIDOCR_INTRA_OP_THREADS or _CPU_COUNT)
+
+
+@contextmanager
+def _get_rapid_ocr(solo: bool = False) -> Iterator[Any]:
+    """Borrow a RapidOCR engine, preferring the all-core engine for *solo* pages."""
+    pool = _RAPID_POOL
+    engine = None
+    if solo and _RAPID_SOLO_POOL.intra_op_threads != _RAPID_POOL.intra_op_threads:
+        engine = _RAPID_SOLO_POOL.try_acquire()
+        if engine is not None:
+            pool = _RAPID_SOLO_POOL
+    if engine is None:
+        engine = pool.acquire()
+    try:
+        yield engine
+    finally:
+        pool.release(engine)
 
 
 def _get_paddle_ocr():
     global _PADDLE_OCR
     if _PADDLE_OCR is None:
-        try:
-            from paddleocr import PaddleOCR  # type: ignore
-        except ImportError as exc:  # pragma: no cover
-            raise RuntimeError(
-                "PaddleOCR がインストールされていません。pip install paddleocr を実行してください。"
-            ) from exc
-        _PADDLE_OCR = PaddleOCR(use_angle_cls=True, lang="japan", show_log=False)
+        with _ENGINE_LOCK:
+            if _PADDLE_OCR is None:
+                try:
+                    from paddleocr import PaddleOCR  # type: ignore
+                except ImportError as exc:  # pragma: no cover
+                    raise RuntimeError(
+                        "PaddleOCR がインストールされていません。pip install paddleocr を実行してください。"
+                    ) from exc
+                _PADDLE_OCR = PaddleOCR(
+                    use_angle_cls=True,
+                    lang="japan",
+                    show_log=False,
+                    rec_batch_num=OCR_BATCH_SIZE,
+                    cls_batch_num=OCR_BATCH_SIZE,
+                )
     return _PADDLE_OCR
 
 
 def _run_rapidocr(image: np.ndarray) -> str:
-    engine = _get_rapid_ocr()
-    result, _ = engine(image)
+    with _get_rapid_ocr(solo=getattr(_SOLO, "active", False)) as engine:
+        result, _ = engine(image)
     if not result:
         return ""
     return " ".join([line[1] for line in result])
@@ -113,12 +293,18 @@ def _run_rapidocr(image: np.ndarray) -> str:
 
 def _run_paddleocr(image: np.ndarray) -> str:
     engine = _get_paddle_ocr()
-    result = engine.ocr(image, cls=True)
-    texts: List[str] = []
-    for line in result:
-        if line and len(line) > 0:
-            texts.append(line[1][0])
-    return " ".join(texts)
+    with _PADDLE_LOCK:
+        result = engine.ocr(image, cls=True)
+    if not result:
+        return ""
+    first = next((block for block in result if block), None)
+    if first is None:
+        return ""
+    # PaddleOCR < 2.6 returns ``[box, (text, score)]`` lines directly; newer
+    # releases nest them in one block per input image.
+    if isinstance(first[-1][0], str):
+        return " ".join(line[1][0] for line in result if line)
+    return " ".join(line[1][0] for block in result if block for line in block)
 
 
 def _parse_yomitoku_payload(payload: dict, page_index: int) -> str:
@@ -140,7 +326,7 @@ def _parse_yomitoku_payload(payload: dict, page_index: int) -> str:
     )
 
 
-def _ocr_yomitoku_rest(images: List[np.ndarray], timeout: int = YOMITOKU_TIMEOUT, max_workers: int = YOMITOKU_MAX_WORKERS) -> List[str]:
+def _ocr_yomitoku_rest(page_paths: List[str], timeout: int = YOMITOKU_TIMEOUT, max_workers: int = YOMITOKU_MAX_WORKERS) -> List[str]:
     base_url = os.getenv("YOMITOKU_BASE_URL", "").strip()
     if not base_url:
         raise YomiTokuError("環境変数 YOMITOKU_BASE_URL が設定されていません。")
@@ -149,11 +335,11 @@ def _ocr_yomitoku_rest(images: List[np.ndarray], timeout: int = YOMITOKU_TIMEOUT
     headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
     base_url = base_url.rstrip("/")
 
-    def worker(item: tuple[int, np.ndarray]) -> str:
-        index, image = item
+    def worker(item: tuple[int, str]) -> str:
+        index, page_path = item
+        png_bytes = _encode_png(_load_page(page_path))
 
         def task() -> str:
-            png_bytes = _encode_png(image)
             files = {"file": (f"page-{index + 1}.png", png_bytes, "image/png")}
             try:
                 response = client.post(endpoint, files=files)
@@ -181,7 +367,7 @@ def _ocr_yomitoku_rest(images: List[np.ndarray], timeout: int = YOMITOKU_TIMEOUT
         )
 
     with httpx.Client(base_url=base_url, timeout=timeout, headers=headers) as client:
-        results = execute_concurrently(worker, list(enumerate(images)), max_workers=max_workers)
+        results = execute_concurrently(worker, list(enumerate(page_paths)), max_workers=max_workers)
     return results
 
 
@@ -289,60 +475,257 @@ def _normalize_yomitoku_payload(raw_payload: Any) -> dict:
     raise YomiTokuError("YomiToku Python API から予期しない型の応答を受け取りました。")
 
 
-def _ocr_yomitoku_python(images: List[np.ndarray], max_workers: int = YOMITOKU_MAX_WORKERS) -> List[str]:
+def _ocr_yomitoku_python(page_paths: List[str], max_workers: int = YOMITOKU_MAX_WORKERS) -> List[str]:
     callable_obj = _resolve_yomitoku_callable()
 
-    def worker(item: tuple[int, np.ndarray]) -> str:
-        index, image = item
+    def worker(item: tuple[int, str]) -> str:
+        index, page_path = item
+        image = _load_page(page_path)
         png_bytes = _encode_png(image)
         raw_payload = _invoke_yomitoku_callable(callable_obj, image, png_bytes)
         payload = _normalize_yomitoku_payload(raw_payload)
         return _parse_yomitoku_payload(payload, index)
 
-    return execute_concurrently(worker, list(enumerate(images)), max_workers=max_workers)
+    return execute_concurrently(worker, list(enumerate(page_paths)), max_workers=max_workers)
 
 
-def _run_batch_ocr(images: List[np.ndarray], runner) -> List[str]:
-    texts: List[str] = []
-    for image in images:
-        texts.append(runner(image))
-    return texts
+def warm_up(backend: str) -> None:
+    """Load the OCR models for *backend* ahead of the first request."""
+    backend = backend.lower()
+    if backend == "paddleocr":
+        _get_paddle_ocr()
+        return
+    # YomiToku falls back to RapidOCR, so its models are preloaded as well. Warm
+    # the engine single-page jobs use; the shared pool fills on demand.
+    with _get_rapid_ocr(solo=True):
+        pass
+
+
+def _process_one_page(page_path: str, runner: Callable[[np.ndarray], str]) -> str:
+    image = _load_page(page_path)
+    processed = _preprocess(image)
+    # Only the binarised page is handed to the model; drop the raster first.
+    del image
+    return runner(processed)
+
+
+@contextmanager
+def _opencv_single_threaded() -> Iterator[None]:
+    """Keep OpenCV on one thread while any job runs pages in parallel."""
+    global _PARALLEL_JOBS
+    with _PARALLEL_JOBS_LOCK:
+        _PARALLEL_JOBS += 1
+        if _PARALLEL_JOBS == 1:
+            cv2.setNumThreads(1)
+    try:
+        yield
+    finally:
+        with _PARALLEL_JOBS_LOCK:
+            _PARALLEL_JOBS -= 1
+            if _PARALLEL_JOBS == 0:
+                cv2.setNumThreads(_OPENCV_DEFAULT_THREADS)
+
+
+def _run_batch_ocr(page_paths: List[str], runner) -> List[str]:
+    workers = min(OCR_MAX_WORKERS, len(page_paths))
+    if workers <= 1:
+        # One page at a time: leave OpenCV its thread pool and let RapidOCR use
+        # the engine sized for every core.
+        _SOLO.active = True
+        try:
+            return [_process_one_page(page_path, runner) for page_path in page_paths]
+        finally:
+            _SOLO.active = False
+    # Each worker loads, preprocesses and recognises one page, so only as many
+    # page images as there are workers are resident at any time. OpenCV and
+    # ONNX Runtime release the GIL, so threads scale across cores; nested
+    # OpenCV parallelism on top of that would only oversubscribe them.
+    with _opencv_single_threaded():
+        return execute_concurrently(
+            lambda page_path: _process_one_page(page_path, runner),
+            page_paths,
+            max_workers=workers,
+        )
 
 
-def _run_yomitoku(images: List[np.ndarray]) -> tuple[List[str], str]:
+def _run_yomitoku(page_paths: List[str]) -> tuple[List[str], str]:
     mode = os.getenv("YOMITOKU_MODE", "").strip().lower()
     if not mode:
         raise YomiTokuError("YOMITOKU_MODE が設定されていません。")
 
     if mode == "rest":
-        texts = _ocr_yomitoku_rest(images)
+        texts = _ocr_yomitoku_rest(page_paths)
         return texts, "yomitoku"
     if mode == "cli":
-        texts = _ocr_yomitoku_python(images)
+        texts = _ocr_yomitoku_python(page_paths)
         return texts, "yomitoku"
     raise YomiTokuError(f"未対応の YOMITOKU_MODE です: {mode}")
 
 
-def ocr_pages(pdf_path: str, dpi: int = 350, backend: str = "yomitoku") -> OCRResult:
+def ocr_pages(pdf_path: str, dpi: int = OCR_DPI, backend: str = "yomitoku") -> OCRResult:
     backend = backend.lower()
     path = Path(pdf_path)
     if not path.exists():
         raise FileNotFoundError(f"PDFが見つかりません: {pdf_path}")
 
-    pil_images = convert_from_path(str(path), dpi=dpi)
-    raw_images: List[np.ndarray] = [cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR) for pil_image in pil_images]
-    preprocessed_images: List[np.ndarray] = [_preprocess(image) for image in raw_images]
+    if OCR_RASTER_CACHE_SIZE <= 0:
+        with tempfile.TemporaryDirectory() as output_folder:
+            return _ocr_page_files(_render_pages(path, dpi, output_folder), backend)
+    with _cached_render_pages(path, dpi) as page_paths:
+        return _ocr_page_files(page_paths, backend)
+
+
+def _render_pages(path: Path, dpi: int, output_folder: str) -> List[str]:
+    # Render straight to disk so pages are decoded one at a time by the workers
+    # instead of holding the whole document in memory.
+    try:
+        return _render_pages_with_pdfium(path, dpi, output_folder)
+    except Exception as exc:
+        logger.warning("pypdfium2 rendering failed for %s, falling back to Poppler: %s", path, exc)
+        for stale in Path(output_folder).glob("*.png"):
+            stale.unlink()
+    return convert_from_path(
+        str(path),
+        dpi=dpi,
+        thread_count=OCR_MAX_WORKERS,
+        output_folder=output_folder,
+        fmt="png",
+        grayscale=True,
+        paths_only=True,
+    )
+
+
+def _render_pages_with_pdfium(path: Path, dpi: int, output_folder: str) -> List[str]:
+    # PDFium renders in-process straight into a grayscale buffer, avoiding a
+    # pdftoppm subprocess per document.
+    import pypdfium2 as pdfium
+
+    def write_page(page_path: str, image: np.ndarray) -> None:
+        if not cv2.imwrite(page_path, image, [cv2.IMWRITE_PNG_COMPRESSION, _PAGE_PNG_COMPRESSION]):
+            raise RuntimeError(f"ページ画像の書き込みに失敗しました: {page_path}")
+
+    page_paths: List[str] = []
+    pending: deque = deque()
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(str(path))
+        page_count = len(pdf)
+    try:
+        with ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS) as executor:
+            for index in range(page_count):
+                # Rasterising is cheap next to the PNG encode, so PDFium runs under
+                # the process-wide lock while pages are encoded in parallel outside it.
+                with PDFIUM_LOCK:
+                    page = pdf[index]
+                    bitmap = page.render(scale=dpi / 72, grayscale=True)
+                    # The array is a view of PDFium's buffer, which close() frees.
+                    image = bitmap.to_numpy().copy()
+                    bitmap.close()
+                    page.close()
+                page_path = str(Path(output_folder) / f"page-{index + 1}.png")
+                pending.append(executor.submit(write_page, page_path, image))
+                page_paths.append(page_path)
+                del image
+                # Bound the number of rendered pages waiting to be encoded.
+                while len(pending) >= OCR_MAX_WORKERS:
+                    pending.popleft().result()
+            while pending:
+                pending.popleft().result()
+    finally:
+        with PDFIUM_LOCK:
+            pdf.close()
+    return page_paths
+
+
+def _hash_pdf(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _sorted_page_files(directory: Path) -> List[str]:
+    def page_number(page_path: Path) -> int:
+        match = _PAGE_NUMBER.search(page_path.name)
+        return int(match.group(1)) if match else 0
+
+    return [str(page_path) for page_path in sorted(directory.glob("*.png"), key=page_number)]
+
+
+@contextmanager
+def _cached_render_pages(path: Path, dpi: int) -> Iterator[List[str]]:
+    """Yield the cached page files for *path*, rendering them on a miss.
+
+    The entry is pinned for the duration of the ``with`` block so eviction by a
+    concurrent task cannot delete pages that are still being recognised.
+    """
+    entry = OCR_RASTER_CACHE_DIR / f"{_hash_pdf(path)}_{dpi}"
+    with _RASTER_CACHE_LOCK:
+        _RASTER_CACHE_USERS[entry] = _RASTER_CACHE_USERS.get(entry, 0) + 1
+        hit = entry.is_dir()
+        if hit:
+            # Directory mtime doubles as the LRU timestamp.
+            os.utime(entry)
+    try:
+        if not hit:
+            _publish_raster_entry(path, dpi, entry)
+        yield _sorted_page_files(entry)
+    finally:
+        with _RASTER_CACHE_LOCK:
+            users = _RASTER_CACHE_USERS.pop(entry) - 1
+            if users:
+                _RASTER_CACHE_USERS[entry] = users
+
+
+def _publish_raster_entry(path: Path, dpi: int, entry: Path) -> None:
+    OCR_RASTER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Render into a private directory and publish it with an atomic rename so
+    # concurrent tasks never see a half-written entry.
+    staging = Path(tempfile.mkdtemp(prefix=_RASTER_STAGING_PREFIX, dir=OCR_RASTER_CACHE_DIR))
+    try:
+        _render_pages(path, dpi, str(staging))
+        os.replace(staging, entry)
+    except OSError:
+        if not entry.is_dir():
+            raise
+        # Another task published the same entry first.
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    with _RASTER_CACHE_LOCK:
+        # The rename keeps the mtime of the last page write; mark the entry as
+        # the most recently used before anything is evicted.
+        os.utime(entry)
+        _evict_raster_cache()
+
+
+def _evict_raster_cache() -> None:
+    # Called with _RASTER_CACHE_LOCK held; pinned entries are never removed.
+    entries = [
+        entry
+        for entry in OCR_RASTER_CACHE_DIR.iterdir()
+        if entry.is_dir() and not entry.name.startswith(_RASTER_STAGING_PREFIX)
+    ]
+    in_use = [entry for entry in entries if entry in _RASTER_CACHE_USERS]
+    entries = [entry for entry in entries if entry not in _RASTER_CACHE_USERS]
+    excess = len(entries) + len(in_use) - OCR_RASTER_CACHE_SIZE
+    if excess <= 0:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:excess]:
+        shutil.rmtree(entry, ignore_errors=True)
+
 
+def _ocr_page_files(page_paths: List[str], backend: str) -> OCRResult:
     backend_used = backend
     texts: List[str]
 
     if backend == "yomitoku":
         try:
-            texts, backend_used = _run_yomitoku(raw_images)
+            texts, backend_used = _run_yomitoku(page_paths)
         except YomiTokuError as exc:
             logger.warning("YomiToku の実行に失敗しました。RapidOCR にフォールバックします: %s", exc)
             backend_used = "rapidocr"
-            texts = _run_batch_ocr(preprocessed_images, _run_rapidocr)
+            texts = _run_batch_ocr(page_paths, _run_rapidocr)
         else:
             total_length = sum(len(text.strip()) for text in texts)
             if total_length < 20:
@@ -351,12 +734,12 @@ def ocr_pages(pdf_path: str, dpi: int = 350, backend: str = "yomitoku") -> OCRRe
                     total_length,
                 )
                 backend_used = "rapidocr"
-                texts = _run_batch_ocr(preprocessed_images, _run_rapidocr)
+                texts = _run_batch_ocr(page_paths, _run_rapidocr)
     elif backend == "rapidocr":
-        texts = _run_batch_ocr(preprocessed_images, _run_rapidocr)
+        texts = _run_batch_ocr(page_paths, _run_rapidocr)
         backend_used = "rapidocr"
     elif backend == "paddleocr":
-        texts = _run_batch_ocr(preprocessed_images, _run_paddleocr)
+        texts = _run_batch_ocr(page_paths, _run_paddleocr)
         backend_used = "paddleocr"
     else:
         raise ValueError("サポートされていないOCRバックエンドです。")
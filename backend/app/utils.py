@@ -1,24 +1,47 @@
 """Utility helpers for storage, task management, and concurrency."""
 from __future__ import annotations
 
+import base64
+import os
 import random
 import shutil
-import string
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Callable, Iterable, List, Sequence, TypeVar, cast
+from typing import Any, BinaryIO, Callable, Dict, Generic, Hashable, Iterable, List, Sequence, Tuple, TypeVar, cast
+
+__all__ = [
+    "PDFIUM_LOCK",
+    "STORAGE_ROOT",
+    "ShardedDict",
+    "TaskState",
+    "clear_task_storage",
+    "ensure_dependencies",
+    "execute_concurrently",
+    "generate_task_id",
+    "init_task_storage",
+    "retry_with_backoff",
+    "save_upload_file",
+    "to_progress",
+]
 
 STORAGE_ROOT = Path(__file__).resolve().parent / "storage"
+# PDFium is not thread-safe, and every upload runs on its own thread; every
+# pypdfium2 call in the process must hold this lock.
+PDFIUM_LOCK = threading.Lock()
 
 T = TypeVar("T")
 R = TypeVar("R")
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
 
 
 def generate_task_id(length: int = 12) -> str:
     """Generate a random task identifier."""
-    alphabet = string.ascii_lowercase + string.digits
-    return "".join(random.choices(alphabet, k=length))
+    # Base32 carries 5 bits per character; draw just enough bytes for *length*.
+    raw = os.urandom((length * 5 + 7) // 8)
+    return base64.b32encode(raw).decode("ascii").rstrip("=").lower()[:length]
 
 
 def init_task_storage(task_id: str) -> Path:
@@ -35,18 +58,18 @@ def clear_task_storage(task_id: str) -> None:
         shutil.rmtree(task_dir, ignore_errors=True)
 
 
-def save_upload_file(dest: Path, data: bytes) -> None:
-    """Persist an uploaded file to disk."""
+def save_upload_file(dest: Path, src: BinaryIO) -> None:
+    """Stream an uploaded file object to disk without buffering it in memory."""
     dest.parent.mkdir(parents=True, exist_ok=True)
     with open(dest, "wb") as file:
-        file.write(data)
+        shutil.copyfileobj(src, file, length=1 << 20)
 
 
 def to_progress(total: int, current: int) -> int:
     """Convert a (total, current) pair into a percentage value."""
     if total <= 0:
         return 0
-    return min(100, int(current / total * 100))
+    return min(100, current * 100 // total)
 
 
 def ensure_dependencies() -> None:
@@ -79,13 +102,8 @@ def execute_concurrently(
         return []
 
     worker_count = max(1, min(max_workers, len(items)))
-    results: List[Any] = [None] * len(items)
     with ThreadPoolExecutor(max_workers=worker_count) as executor:
-        future_map = {executor.submit(func, item): idx for idx, item in enumerate(items)}
-        for future in as_completed(future_map):
-            idx = future_map[future]
-            results[idx] = future.result()
-    return [cast(R, result) for result in results]
+        return list(executor.map(func, items))
 
 
 def retry_with_backoff(
@@ -94,42 +112,86 @@ def retry_with_backoff(
     attempts: int = 3,
     base_delay: float = 1.0,
     multiplier: float = 2.0,
+    cap: float = 30.0,
     exceptions: Iterable[type[BaseException]] = (Exception,),
     logger: Any | None = None,
 ) -> R:
-    """Execute *func* with exponential backoff retries.
+    """Execute *func* with exponential backoff retries and decorrelated jitter.
 
     Args:
         func: Callable without arguments to execute.
         attempts: Maximum number of attempts.
         base_delay: Initial delay between attempts.
-        multiplier: Multiplicative factor for the delay.
+        multiplier: Upper bound growth factor for the next delay.
+        cap: Maximum delay between attempts.
         exceptions: Exception types that trigger a retry.
         logger: Optional logger for retry messages.
 
     Raises:
+        ValueError: If *attempts* is less than 1.
         The last exception if all attempts fail.
     """
 
-    delay = base_delay
-    last_exc: BaseException | None = None
+    if attempts < 1:
+        raise ValueError("attempts must be at least 1")
+
+    delay = min(cap, base_delay)
     exception_tuple = tuple(exceptions)
 
-    for attempt in range(1, attempts + 1):
+    for attempt in range(1, attempts):
         try:
             return func()
-        except exception_tuple as exc:  # type: ignore[arg-type]
-            last_exc = exc
-            if attempt >= attempts:
-                raise
+        except exception_tuple as exc:  # type: ignore[misc]
             if logger is not None:
                 logger.warning("Retrying after error (attempt %s/%s): %s", attempt, attempts, exc)
             time.sleep(delay)
-            delay *= multiplier
-    # This should be unreachable because either func returned or the loop raised.
-    if last_exc is not None:  # pragma: no cover
-        raise last_exc
-    raise RuntimeError("retry_with_backoff failed without capturing an exception")  # pragma: no cover
+            # Randomise each wait so concurrent callers do not retry in lockstep.
+            delay = min(cap, random.uniform(base_delay, delay * multiplier))
+    return func()
+
+
+class ShardedDict(Generic[K, V]):
+    """Dictionary split into independently locked shards.
+
+    Operations on different keys usually land on different shards, so
+    concurrent tasks do not contend on a single global lock.
+    """
+
+    def __init__(self, num_shards: int = 16) -> None:
+        self._shards: List[Tuple[Dict[K, V], threading.Lock]] = [
+            ({}, threading.Lock()) for _ in range(max(1, num_shards))
+        ]
+
+    def _shard(self, key: K) -> Tuple[Dict[K, V], threading.Lock]:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        data, lock = self._shard(key)
+        with lock:
+            return data.get(key, default)
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        data, lock = self._shard(key)
+        with lock:
+            return data.pop(key, default)
+
+    def __setitem__(self, key: K, value: V) -> None:
+        data, lock = self._shard(key)
+        with lock:
+            data[key] = value
+
+    def __getitem__(self, key: K) -> V:
+        data, lock = self._shard(key)
+        with lock:
+            return data[key]
+
+    def __contains__(self, key: object) -> bool:
+        data, lock = self._shard(cast(K, key))
+        with lock:
+            return key in data
+
+    def __len__(self) -> int:
+        return sum(len(data) for data, _ in self._shards)
 
 
 class TaskState:
@@ -158,7 +220,7 @@ class TaskState:
             "status": self.status,
             "error": self.error,
             "pages": self.pages,
-            "totals": self.totals,
+            "totals": dict(self.totals),
             "backend_requested": self.backend_requested,
             "backend_used": self.backend_used,
         }
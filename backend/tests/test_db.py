@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("pandas")
+
+from app.db import load_db_csv  # noqa: E402
+
+
+def test_load_db_csv_keeps_values_as_strings():
+    data = "HINBAN,Kidou,zaiku,extra\n0012,手動,,x\nAB-1,電動,NA,y\n".encode("cp932")
+    df = load_db_csv(data)
+    assert list(df.columns) == ["hinban", "kidou", "zaiku"]
+    assert df.to_dict(orient="records") == [
+        {"hinban": "0012", "kidou": "手動", "zaiku": ""},
+        {"hinban": "AB-1", "kidou": "電動", "zaiku": "NA"},
+    ]
+
+
+def test_load_db_csv_rejects_missing_columns():
+    with pytest.raises(ValueError):
+        load_db_csv(b"hinban,kidou\nAB-1,x\n")
+
+
+def test_load_db_csv_ignores_repeated_header_names():
+    df = load_db_csv("hinban,kidou,zaiku,hinban\nAB-1,手動,あり,ZZ-9\n".encode("utf-8"))
+    assert list(df.columns) == ["hinban", "kidou", "zaiku"]
+    assert df.to_dict(orient="records") == [{"hinban": "AB-1", "kidou": "手動", "zaiku": "あり"}]
@@ -0,0 +1,71 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("pandas")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import main, utils  # noqa: E402
+
+
+def test_rows_csv_round_trip(tmp_path):
+    rows = [{"pdf_name": "仕様書.pdf", "page": 3, "token": "AB-1234"}]
+    path = tmp_path / "failure.csv"
+    main._write_rows_csv(path, rows, main.FAILURE_COLUMNS)
+
+    assert path.read_bytes().startswith(b"\xef\xbb\xbfpdf_name,page,token\n")
+    assert main._read_rows_csv(path) == rows
+
+    empty_path = tmp_path / "results.csv"
+    main._write_rows_csv(empty_path, [], main.RESULT_COLUMNS)
+    assert empty_path.read_text(encoding="utf-8-sig") == ",".join(main.RESULT_COLUMNS) + "\n"
+    assert main._read_rows_csv(empty_path) == []
+    assert main._read_rows_csv(None) == []
+
+
+def test_results_are_served_from_csv_when_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "STORAGE_ROOT", tmp_path)
+    monkeypatch.setattr(main, "RESULT_CACHE_MAX_ROWS", 0)
+    monkeypatch.setattr(
+        main,
+        "extract_pdf_text",
+        lambda path, backend: (["型番 AB-1234 / ZX-9000-ALPHA"], "rapidocr"),
+    )
+
+    client = TestClient(main.app)
+    response = client.post(
+        "/api/upload",
+        files=[
+            ("db_csv", ("db.csv", "hinban,kidou,zaiku\nAB-1234,標準起動,在庫あり\n".encode("utf-8"), "text/csv")),
+            ("pdfs", ("a.pdf", b"%PDF-1.4", "application/pdf")),
+        ],
+        params={"ocr_backend": "rapidocr"},
+    )
+    task_id = response.json()["task_id"]
+    for _ in range(100):
+        if main.TASKS[task_id].status in {"completed", "error"}:
+            break
+        time.sleep(0.05)
+    assert main.TASKS[task_id].status == "completed"
+    assert task_id not in main.RESULT_CACHE
+    assert task_id not in main.FAILURE_CACHE
+
+    results = client.get(f"/api/results/{task_id}").json()
+    failures = client.get(f"/api/failures/{task_id}").json()
+    assert results == [
+        {
+            "pdf_name": "a.pdf",
+            "page": 1,
+            "token": "AB-1234",
+            "hinban": "AB-1234",
+            "kidou": "標準起動",
+            "zaiku": "在庫あり",
+        }
+    ]
+    assert failures == [{"pdf_name": "a.pdf", "page": 1, "token": "ZX-9000-ALPHA"}]
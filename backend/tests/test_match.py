@@ -1,9 +1,20 @@
 import sys
+import time
 from pathlib import Path
 
+import pytest
+
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from app.match import extract_tokens, normalize  # noqa: E402
+from app import match  # noqa: E402
+from app.match import (  # noqa: E402
+    build_database_index,
+    clear_normalize_cache,
+    extract_tokens,
+    match_token_to_db,
+    normalize,
+    normalize_series,
+)
 
 
 def test_normalize_converts_fullwidth_and_case():
@@ -15,3 +26,58 @@ def test_extract_tokens_filters_blacklist():
     tokens = extract_tokens(text)
     assert 'AB-1234' in tokens
     assert 'SCALE' not in tokens
+
+
+def test_extract_tokens_scans_long_digit_free_runs_linearly():
+    started = time.perf_counter()
+    tokens = extract_tokens("AB-" * 20000 + " HX-7788")
+    assert tokens == ["HX-7788"]
+    # A backtracking digit lookahead needs tens of seconds on this input.
+    assert time.perf_counter() - started < 1.0
+
+
+def test_extract_tokens_keeps_page_text_out_of_normalize_cache():
+    clear_normalize_cache()
+    extract_tokens('図番 AB-1234 / ZX-9000 ' * 50)
+    assert match._normalize_cached.cache_info().currsize == 0
+
+
+def test_match_token_to_db_returns_first_matching_row():
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame(
+        {
+            "hinban": ["ab-1234", "XY-9999", "AB-1234"],
+            "kidou": ["手動", "自動", "電動"],
+            "zaiku": ["10", "0", "5"],
+        }
+    )
+    index = build_database_index(df)
+    assert list(df.columns) == ["hinban", "kidou", "zaiku"]
+
+    match = match_token_to_db("ＡＢ－１２３４", index)
+    assert match == {"matched": True, "hinban": "ab-1234", "kidou": "手動", "zaiku": "10"}
+    assert match_token_to_db("ZZ-0000", index) == {"matched": False}
+
+
+def test_normalize_series_matches_scalar_normalize():
+    pd = pytest.importorskip("pandas")
+    values = ["ａｂ－１２３ｃ", " x—12　 34 ", "Ｙ−９", "", None]
+    expected = [normalize(value) for value in values]
+    assert normalize_series(pd.Series(values)).tolist() == expected
+
+
+def test_trie_row_map_matches_dict_lookup():
+    pytest.importorskip("marisa_trie")
+    from app.match import TrieRowMap
+
+    rows = {
+        "AB-1234": {"hinban": "ab-1234", "kidou": "手動", "zaiku": "10"},
+        "AB-12345": {"hinban": "AB-12345", "kidou": "自動", "zaiku": "0"},
+    }
+    mapping = TrieRowMap(rows)
+
+    assert len(mapping) == 2
+    assert mapping.get("AB-1234") == rows["AB-1234"]
+    assert mapping["AB-12345"] == rows["AB-12345"]
+    assert mapping.get("AB-123") is None
+    assert dict(mapping) == rows
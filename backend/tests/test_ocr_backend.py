@@ -9,14 +9,6 @@ pytest.importorskip("cv2")
 from app import ocr_backend
 
 
-class _ArrayImage:
-    def __init__(self, array):
-        self._array = array
-
-    def __array__(self):  # pragma: no cover - simple adapter
-        return self._array
-
-
 def _create_dummy_pdf(path: Path) -> None:
     path.write_bytes(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n2 0 obj<</Type/Pages/Count 1/Kids[3 0 R]>>endobj\n3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 10 10]/Contents 4 0 R/Resources<</ProcSet[/PDF/Text]/Font<</F1 5 0 R>>>>>>endobj\n4 0 obj<</Length 44>>stream\nBT /F1 8 Tf 1 0 0 1 2 5 Tm (dummy) Tj ET\nendstream\nendobj\n5 0 obj<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>endobj\nxref\n0 6\n0000000000 65535 f \n0000000015 00000 n \n0000000062 00000 n \n0000000115 00000 n \n0000000274 00000 n \n0000000372 00000 n \ntrailer<</Size 6/Root 1 0 R>>\nstartxref\n434\n%%EOF\n")
 
@@ -29,8 +21,13 @@ def test_yomitoku_falls_back_to_rapid(monkeypatch, tmp_path):
 
     sample_array = ocr_backend.np.full((10, 10, 3), 255, dtype=ocr_backend.np.uint8)
 
-    def fake_convert_from_path(path: str, dpi: int = 350):  # type: ignore[override]
-        return [_ArrayImage(sample_array)]
+    def fake_convert_from_path(path: str, dpi: int = 350, **kwargs):  # type: ignore[override]
+        page_path = Path(kwargs["output_folder"]) / "page-1.png"
+        ocr_backend.cv2.imwrite(str(page_path), sample_array)
+        return [str(page_path)]
+
+    def broken_pdfium(path: Path, dpi: int, output_folder: str):  # type: ignore[override]
+        raise RuntimeError("pdfium unavailable")
 
     def fake_preprocess(image):  # type: ignore[override]
         return image
@@ -38,6 +35,7 @@ def test_yomitoku_falls_back_to_rapid(monkeypatch, tmp_path):
     def fake_rapidocr(image):  # type: ignore[override]
         return "rapid-text"
 
+    monkeypatch.setattr(ocr_backend, "_render_pages_with_pdfium", broken_pdfium)
     monkeypatch.setattr(ocr_backend, "convert_from_path", fake_convert_from_path)
     monkeypatch.setattr(ocr_backend, "_preprocess", fake_preprocess)
     monkeypatch.setattr(ocr_backend, "_run_rapidocr", fake_rapidocr)
@@ -46,3 +44,224 @@ def test_yomitoku_falls_back_to_rapid(monkeypatch, tmp_path):
 
     assert list(result) == ["rapid-text"]
     assert getattr(result, "backend_used") == "rapidocr"
+
+
+def test_rendered_pages_are_cached_per_pdf_and_dpi(monkeypatch, tmp_path):
+    pdf_path = tmp_path / "sample.pdf"
+    _create_dummy_pdf(pdf_path)
+    other_pdf = tmp_path / "other.pdf"
+    other_pdf.write_bytes(pdf_path.read_bytes() + b"\n")
+    cache_dir = tmp_path / "rasters"
+    monkeypatch.setattr(ocr_backend, "OCR_RASTER_CACHE_DIR", cache_dir)
+    monkeypatch.setattr(ocr_backend, "OCR_RASTER_CACHE_SIZE", 1)
+
+    renders = []
+    page = ocr_backend.np.full((10, 10), 255, dtype=ocr_backend.np.uint8)
+
+    def fake_render_pages(path: Path, dpi: int, output_folder: str):  # type: ignore[override]
+        renders.append((path, dpi))
+        paths = []
+        for number in (10, 2, 1):
+            page_path = Path(output_folder) / f"page-{number:d}.png"
+            ocr_backend.cv2.imwrite(str(page_path), page)
+            paths.append(str(page_path))
+        return paths
+
+    monkeypatch.setattr(ocr_backend, "_render_pages", fake_render_pages)
+
+    with ocr_backend._cached_render_pages(pdf_path, 200) as first:
+        pass
+    with ocr_backend._cached_render_pages(pdf_path, 200) as second:
+        pass
+
+    assert len(renders) == 1
+    assert first == second
+    assert [Path(page_path).name for page_path in first] == ["page-1.png", "page-2.png", "page-10.png"]
+
+    with ocr_backend._cached_render_pages(other_pdf, 200) as other:
+        assert len(other) == 3
+
+    assert len(renders) == 2
+    assert len([entry for entry in cache_dir.iterdir()]) == 1
+    assert not Path(first[0]).exists()
+    assert all(Path(page_path).exists() for page_path in other)
+
+
+def test_raster_cache_keeps_entries_in_use_at_size_one(monkeypatch, tmp_path):
+    first_pdf = tmp_path / "a.pdf"
+    _create_dummy_pdf(first_pdf)
+    second_pdf = tmp_path / "b.pdf"
+    second_pdf.write_bytes(first_pdf.read_bytes() + b"\n")
+    cache_dir = tmp_path / "rasters"
+    monkeypatch.setattr(ocr_backend, "OCR_RASTER_CACHE_DIR", cache_dir)
+    monkeypatch.setattr(ocr_backend, "OCR_RASTER_CACHE_SIZE", 1)
+    page = ocr_backend.np.full((10, 10), 255, dtype=ocr_backend.np.uint8)
+
+    def fake_render_pages(path: Path, dpi: int, output_folder: str):  # type: ignore[override]
+        page_path = Path(output_folder) / "page-1.png"
+        ocr_backend.cv2.imwrite(str(page_path), page)
+        return [str(page_path)]
+
+    monkeypatch.setattr(ocr_backend, "_render_pages", fake_render_pages)
+
+    # Task A is still recognising its pages while task B caches another PDF.
+    with ocr_backend._cached_render_pages(first_pdf, 200) as first_pages:
+        with ocr_backend._cached_render_pages(second_pdf, 200) as second_pages:
+            assert len(second_pages) == 1
+            assert ocr_backend._load_page(second_pages[0]).shape == (10, 10)
+        assert ocr_backend._load_page(first_pages[0]).shape == (10, 10)
+
+    # Once nothing uses them, the next publish trims the cache back to one entry.
+    third_pdf = tmp_path / "c.pdf"
+    third_pdf.write_bytes(first_pdf.read_bytes() + b"\n\n")
+    with ocr_backend._cached_render_pages(third_pdf, 200) as third_pages:
+        assert len(third_pages) == 1
+    assert [entry.name for entry in cache_dir.iterdir()] == [Path(third_pages[0]).parent.name]
+
+
+def test_render_pages_uses_pdfium_and_falls_back_to_poppler(monkeypatch, tmp_path):
+    pytest.importorskip("pypdfium2")
+    pdf_path = tmp_path / "sample.pdf"
+    _create_dummy_pdf(pdf_path)
+    output = tmp_path / "out"
+    output.mkdir()
+
+    def fake_convert_from_path(path: str, dpi: int = 350, **kwargs):  # type: ignore[override]
+        return ["poppler-page.png"]
+
+    monkeypatch.setattr(ocr_backend, "convert_from_path", fake_convert_from_path)
+
+    pages = ocr_backend._render_pages(pdf_path, 72, str(output))
+    assert pages == [str(output / "page-1.png")]
+    assert ocr_backend.cv2.imread(pages[0], ocr_backend.cv2.IMREAD_UNCHANGED).shape == (10, 10)
+
+    def broken_pdfium(path: Path, dpi: int, output_folder: str):  # type: ignore[override]
+        raise RuntimeError("pdfium unavailable")
+
+    monkeypatch.setattr(ocr_backend, "_render_pages_with_pdfium", broken_pdfium)
+    assert ocr_backend._render_pages(pdf_path, 72, str(output)) == ["poppler-page.png"]
+    assert not list(output.glob("*.png"))
+
+
+def test_render_pages_with_pdfium_writes_every_page_in_order(monkeypatch, tmp_path):
+    pdfium = pytest.importorskip("pypdfium2")
+    single = tmp_path / "single.pdf"
+    _create_dummy_pdf(single)
+    pdf_path = tmp_path / "three.pdf"
+    document = pdfium.PdfDocument.new()
+    source = pdfium.PdfDocument(str(single))
+    for _ in range(3):
+        document.import_pages(source)
+    document.save(str(pdf_path))
+    document.close()
+    source.close()
+    output = tmp_path / "out"
+    output.mkdir()
+    monkeypatch.setattr(ocr_backend, "OCR_MAX_WORKERS", 2)
+
+    pages = ocr_backend._render_pages_with_pdfium(pdf_path, 144, str(output))
+
+    assert pages == [str(output / f"page-{number}.png") for number in (1, 2, 3)]
+    assert all(ocr_backend.cv2.imread(page, ocr_backend.cv2.IMREAD_UNCHANGED).shape == (20, 20) for page in pages)
+
+
+def test_preprocess_keeps_upright_page_upright():
+    np = ocr_backend.np
+    image = np.full((200, 400, 3), 255, dtype=np.uint8)
+    image[90:110, 40:360] = 0
+
+    result = ocr_backend._preprocess(image)
+
+    rows, cols = np.where(result < 255)
+    assert result.shape == (200, 400)
+    assert cols.max() - cols.min() > rows.max() - rows.min()
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        [[[[0, 0], [1, 0], [1, 1], [0, 1]], ("AB-1234", 0.9)], [[[0, 2], [1, 2], [1, 3], [0, 3]], ("ZX-9000", 0.8)]],
+        [[[[[0, 0], [1, 0], [1, 1], [0, 1]], ("AB-1234", 0.9)], [[[0, 2], [1, 2], [1, 3], [0, 3]], ("ZX-9000", 0.8)]]],
+    ],
+    ids=["flat", "nested"],
+)
+def test_run_paddleocr_joins_both_result_shapes(monkeypatch, result):
+    class FakePaddle:
+        def ocr(self, image, cls=True):
+            return result
+
+    monkeypatch.setattr(ocr_backend, "_get_paddle_ocr", lambda: FakePaddle())
+
+    assert ocr_backend._run_paddleocr(ocr_backend.np.zeros((4, 4), dtype=ocr_backend.np.uint8)) == "AB-1234 ZX-9000"
+
+
+def test_run_paddleocr_handles_empty_page(monkeypatch):
+    class FakePaddle:
+        def ocr(self, image, cls=True):
+            return [None]
+
+    monkeypatch.setattr(ocr_backend, "_get_paddle_ocr", lambda: FakePaddle())
+
+    assert ocr_backend._run_paddleocr(ocr_backend.np.zeros((4, 4), dtype=ocr_backend.np.uint8)) == ""
+
+
+def test_rapid_ocr_pool_is_bounded_by_worker_count(monkeypatch):
+    created = []
+
+    def fake_create(intra_op_threads):
+        created.append((object(), intra_op_threads))
+        return created[-1]
+
+    monkeypatch.setattr(ocr_backend, "_create_rapid_ocr", fake_create)
+    monkeypatch.setattr(ocr_backend, "_RAPID_POOL", ocr_backend._EnginePool(2, 2))
+    monkeypatch.setattr(ocr_backend, "_RAPID_SOLO_POOL", ocr_backend._EnginePool(1, 4))
+
+    with ocr_backend._get_rapid_ocr() as first, ocr_backend._get_rapid_ocr() as second:
+        assert first is not second
+    with ocr_backend._get_rapid_ocr() as third:
+        assert third in (first, second)
+    assert [threads for _, threads in created] == [2, 2]
+
+    # Single-page jobs get the all-core engine, and borrow a pooled one while it is busy.
+    with ocr_backend._get_rapid_ocr(solo=True) as solo, ocr_backend._get_rapid_ocr(solo=True) as fallback:
+        assert solo[1] == 4
+        assert fallback in (first, second)
+    assert len(created) == 3
+
+
+def test_heavy_denoise_threshold_matches_adaptive_threshold(monkeypatch):
+    np = ocr_backend.np
+    cv2 = ocr_backend.cv2
+    rng = np.random.default_rng(0)
+    page = cv2.GaussianBlur(rng.integers(0, 256, (120, 160), dtype=np.uint8), (5, 5), 0)
+    page[:10, :10] = 0
+    page[-10:, -10:] = 255
+
+    # Deskewing is not under test here; compare the binarised page directly.
+    monkeypatch.setattr(ocr_backend, "_MIN_DESKEW_ANGLE", 360.0)
+    result = ocr_backend._preprocess(page, heavy_denoise=True)
+
+    filtered = cv2.bilateralFilter(cv2.medianBlur(page, 3), 9, 75, 75)
+    expected = cv2.adaptiveThreshold(filtered, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 31, 10)
+    assert np.array_equal(result, expected)
+
+
+def test_run_batch_ocr_sizes_threads_from_page_count(monkeypatch):
+    cv2 = ocr_backend.cv2
+    default_threads = cv2.getNumThreads()
+    seen = []
+
+    def fake_process(page_path, runner):
+        seen.append((page_path, getattr(ocr_backend._SOLO, "active", False), cv2.getNumThreads()))
+        return page_path
+
+    monkeypatch.setattr(ocr_backend, "_process_one_page", fake_process)
+    monkeypatch.setattr(ocr_backend, "OCR_MAX_WORKERS", 4)
+
+    assert ocr_backend._run_batch_ocr(["only"], runner=None) == ["only"]
+    assert seen == [("only", True, default_threads)]
+
+    seen.clear()
+    assert ocr_backend._run_batch_ocr(["a", "b", "c"], runner=None) == ["a", "b", "c"]
+    assert sorted(seen) == [("a", False, 1), ("b", False, 1), ("c", False, 1)]
+    assert cv2.getNumThreads() == default_threads
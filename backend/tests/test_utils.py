@@ -0,0 +1,68 @@
+import io
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest  # noqa: E402
+
+from app import utils  # noqa: E402
+from app.utils import ShardedDict, retry_with_backoff, save_upload_file, to_progress  # noqa: E402
+
+
+def test_sharded_dict_behaves_like_a_mapping():
+    store: ShardedDict[str, int] = ShardedDict(num_shards=4)
+    for idx in range(20):
+        store[f"task-{idx}"] = idx
+
+    assert len(store) == 20
+    assert store["task-3"] == 3
+    assert "task-7" in store
+    assert store.get("missing") is None
+    assert store.pop("task-7") == 7
+    assert "task-7" not in store
+
+
+def test_save_upload_file_streams_to_disk(tmp_path):
+    payload = b"%PDF-1.4" + bytes(range(256)) * 8192
+    dest = tmp_path / "nested" / "upload.pdf"
+
+    save_upload_file(dest, io.BytesIO(payload))
+
+    assert dest.read_bytes() == payload
+
+
+def test_to_progress_uses_integer_percentages():
+    assert to_progress(0, 5) == 0
+    assert to_progress(3, 1) == 33
+    assert to_progress(3, 3) == 100
+    assert to_progress(3, 4) == 100
+
+
+def test_retry_with_backoff_jitters_within_cap(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(utils.time, "sleep", sleeps.append)
+    calls = {"count": 0}
+
+    def flaky():
+        calls["count"] += 1
+        if calls["count"] < 5:
+            raise RuntimeError("transient")
+        return "ok"
+
+    assert retry_with_backoff(flaky, attempts=5, base_delay=1.0, multiplier=3.0, cap=2.5) == "ok"
+    assert len(sleeps) == 4
+    assert sleeps[0] == 1.0
+    assert all(1.0 <= delay <= 2.5 for delay in sleeps)
+
+
+def test_retry_with_backoff_reraises_last_error(monkeypatch):
+    monkeypatch.setattr(utils.time, "sleep", lambda _: None)
+
+    def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        retry_with_backoff(failing, attempts=2)
+    with pytest.raises(ValueError, match="attempts"):
+        retry_with_backoff(failing, attempts=0)
@@ -0,0 +1,68 @@
+"""Quantize the bundled RapidOCR detection/recognition models to INT8.
+
+Run once per environment, then start the backend with ``RAPIDOCR_INT8=1``::
+
+    python scripts/quantize_rapidocr.py [--output-dir DIR] [--all-ops]
+
+The output directory defaults to ``RAPIDOCR_INT8_DIR`` or ``~/.rapidocr/int8``.
+Requires the ``onnx`` package in addition to ``onnxruntime``.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import rapidocr_onnxruntime
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from onnxruntime.quantization.shape_inference import quant_pre_process
+
+MODELS = {
+    "det": "ch_PP-OCRv4_det_infer.onnx",
+    "rec": "ch_PP-OCRv4_rec_infer.onnx",
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--output-dir",
+        default=os.getenv("RAPIDOCR_INT8_DIR", str(Path.home() / ".rapidocr" / "int8")),
+    )
+    parser.add_argument(
+        "--all-ops",
+        action="store_true",
+        help="also quantize Conv layers (smaller files, but ConvInteger is often slower on CPU)",
+    )
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir).expanduser()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model_dir = Path(rapidocr_onnxruntime.__file__).resolve().parent / "models"
+    op_types = None if args.all_ops else ["MatMul", "Gemm"]
+
+    for kind, filename in MODELS.items():
+        source = model_dir / filename
+        if not source.exists():
+            print(f"model not found: {source}", file=sys.stderr)
+            return 1
+        target = output_dir / f"{kind}_int8.onnx"
+        with tempfile.TemporaryDirectory() as tmp:
+            # Folding the exported graph first turns Paddle's weight nodes into
+            # initializers, which quantize_dynamic requires.
+            prepared = Path(tmp) / filename
+            quant_pre_process(str(source), str(prepared), skip_symbolic_shape=True)
+            quantize_dynamic(
+                str(prepared),
+                str(target),
+                weight_type=QuantType.QInt8,
+                op_types_to_quantize=op_types,
+            )
+        print(f"{source.name} -> {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())